@@ -39,23 +39,33 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
+    render_as_batch = settings.database_url.startswith("sqlite")
+    shared_connection = config.attributes.get("connection")
+    if shared_connection is not None:
+        # Caller-provided connection (in-memory SQLite): the schema must land on it.
+        _run_with_connection(shared_connection, render_as_batch)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-    render_as_batch = settings.database_url.startswith("sqlite")
 
     with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,
-            render_as_batch=render_as_batch,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_with_connection(connection, render_as_batch)
+
+
+def _run_with_connection(connection, render_as_batch: bool) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        render_as_batch=render_as_batch,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 def run_migrations() -> None:
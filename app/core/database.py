@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from app.core import monkeypatches  # noqa: F401 - ensure SQLAlchemy patches load early
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.core.config import settings
 
@@ -12,10 +13,30 @@ class Base(DeclarativeBase):
 
 
 engine_kwargs: dict = {}
+IN_MEMORY_DATABASE = False
 if settings.database_url.startswith("sqlite"):
     engine_kwargs["connect_args"] = {"check_same_thread": False}
+    # Each new connection to ":memory:" opens a fresh, empty database, so every session
+    # (and the migrations) must share the one connection StaticPool hands out.
+    IN_MEMORY_DATABASE = make_url(settings.database_url).database in (None, "", ":memory:")
+    if IN_MEMORY_DATABASE:
+        engine_kwargs["poolclass"] = StaticPool
 
 engine = create_engine(settings.database_url, echo=False, future=True, **engine_kwargs)
+
+if settings.database_url.startswith("sqlite") and not IN_MEMORY_DATABASE and settings.sqlite_fast_pragmas:
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+        # WAL drops the rollback-journal double write and, with synchronous=NORMAL, only
+        # fsyncs at checkpoints instead of on every commit.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 
@@ -5,6 +5,8 @@ from pathlib import Path
 from alembic import command
 from alembic.config import Config
 
+from app.core.database import IN_MEMORY_DATABASE, engine
+
 
 def run_migrations() -> None:
     """Run Alembic migrations programmatically for local development."""
@@ -12,4 +14,10 @@ def run_migrations() -> None:
     alembic_ini = project_root / "alembic.ini"
     alembic_cfg = Config(str(alembic_ini))
     alembic_cfg.set_main_option("script_location", str(project_root / "alembic"))
+    if IN_MEMORY_DATABASE:
+        # Alembic's own engine would migrate a separate, throwaway in-memory database.
+        with engine.begin() as connection:
+            alembic_cfg.attributes["connection"] = connection
+            command.upgrade(alembic_cfg, "head")
+        return
     command.upgrade(alembic_cfg, "head")
@@ -67,7 +67,7 @@ def delete_template(
     db: Session = Depends(get_db),
     _: object = Depends(auth_service.require_role([UserRole.admin.value])),
 ) -> Response:
-    template = _get_template_or_404(db, template_id)
+    template = _get_template_or_404(db, template_id, strict=False)
     template_service.delete_template(db, template)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -159,8 +159,8 @@ def delete_item(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-def _get_template_or_404(db: Session, template_id: str):
-    template = template_service.get_template(db, template_id)
+def _get_template_or_404(db: Session, template_id: str, *, strict: bool = True):
+    template = template_service.get_template(db, template_id, strict=strict)
     if not template:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
     return template
@@ -44,8 +44,7 @@ def save_media_file(
 
     suffix = _choose_suffix(original_name, mime_type)
     filename = f"{uuid.uuid4().hex}{suffix}"
-    file_path = STORAGE_DIR / filename
-    file_path.write_bytes(content)
+    _store_media_bytes(filename, content)
 
     media_id = uuid.uuid4().hex
     media = MediaFile(
@@ -136,6 +135,10 @@ def resolve_media_path(media: MediaFile) -> Path:
     return candidate
 
 
+def _store_media_bytes(filename: str, content: bytes) -> None:
+    (STORAGE_DIR / filename).write_bytes(content)
+
+
 def _detect_mime_type(content: bytes, declared_type: str | None, original_name: str | None) -> str:
     """Best-effort content sniffing to avoid trusting the browser-provided type."""
     detected_image = _detect_image_mime(content)
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from collections import Counter
 from datetime import date, datetime, time
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
 from fpdf import FPDF
-from sqlalchemy import case, func
+from sqlalchemy import case, func, select
 from sqlalchemy.orm import Session, selectinload
 
 from app.models.entities import (
@@ -19,6 +19,14 @@ from app.models.entities import (
 
 
 def build_inspection_summary(inspection: Inspection) -> dict:
+    """
+    Serialize an inspection (responses, media, actions) for JSON/PDF export.
+
+    Intentionally not memoized: Inspection has no updated_at/version column and the
+    summary also reflects child rows, so there is no cheap key that detects staleness.
+    Callers already pass an instance with the relationships eager-loaded.
+    """
+
     return {
         "inspection_id": inspection.id,
         "template": inspection.template.name if inspection.template else None,
@@ -62,10 +70,23 @@ def _format_optional_number(value: float | int | None) -> str:
     return str(value)
 
 
-def render_pdf(summary: dict) -> bytes:
+def _new_report_pdf() -> FPDF:
+    """
+    Create a document with the shared report page setup.
+
+    fpdf2 keeps the core font metrics (Helvetica) in module-level tables, so a fresh
+    FPDF per request only pays for its own page state; font dicts must not be shared
+    between documents because they carry per-document font indices.
+    """
+
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
+    return pdf
+
+
+def render_pdf(summary: dict) -> bytes:
+    pdf = _new_report_pdf()
     pdf.set_font("Helvetica", "B", 16)
     pdf.cell(0, 10, "Inspection Report", ln=True)
 
@@ -132,8 +153,10 @@ def _combine_range(start_date: date, end_date: date) -> tuple[datetime, datetime
     return start_dt, end_dt
 
 
-def _summarize_counter(counter: Mapping[str, int]) -> list[tuple[str, int]]:
-    return sorted(counter.items(), key=lambda entry: entry[1], reverse=True)
+def _ordered_counts(labels: Iterable[str]) -> dict[str, int]:
+    """Count ``labels`` into a dict ordered largest bucket first, ties broken by label."""
+    counter = Counter(labels)
+    return dict(sorted(counter.items(), key=lambda entry: (-entry[1], entry[0])))
 
 
 def build_inspections_range_summary(
@@ -152,23 +175,19 @@ def build_inspections_range_summary(
 
     filters = filters or {}
     start_dt, end_dt = _combine_range(start_date, end_date)
-    base_query = (
-        db.query(Inspection)
-        .options(selectinload(Inspection.template), selectinload(Inspection.inspector))
-        .filter(
-            Inspection.submitted_at.isnot(None),
-            Inspection.submitted_at >= start_dt,
-            Inspection.submitted_at <= end_dt,
-        )
-    )
+    criteria: list[Any] = [
+        Inspection.submitted_at.isnot(None),
+        Inspection.submitted_at >= start_dt,
+        Inspection.submitted_at <= end_dt,
+    ]
 
     assignee_id = filters.get("assignee_id")
     if assignee_id:
-        base_query = base_query.filter(Inspection.inspector_id == assignee_id)
+        criteria.append(Inspection.inspector_id == assignee_id)
 
     template_filter = filters.get("template_id")
     if template_filter:
-        base_query = base_query.filter(Inspection.template_id == template_filter)
+        criteria.append(Inspection.template_id == template_filter)
 
     location_filter_label: str | None = None
     raw_location_id = filters.get("location_id")
@@ -180,37 +199,46 @@ def build_inspections_range_summary(
         except (TypeError, ValueError):
             location_id = None
     if location_id:
-        base_query = base_query.filter(Inspection.location_id == location_id)
+        criteria.append(Inspection.location_id == location_id)
         location_filter_label = f"Location ID {location_id}"
     elif location_name:
-        base_query = base_query.filter(Inspection.location == location_name)
+        criteria.append(Inspection.location == location_name)
         location_filter_label = location_name
 
-    inspections = base_query.order_by(Inspection.submitted_at.asc()).all()
+    inspections = (
+        db.query(Inspection)
+        .options(selectinload(Inspection.template), selectinload(Inspection.inspector))
+        .filter(*criteria)
+        .order_by(Inspection.submitted_at.asc())
+        .all()
+    )
     inspection_ids = [inspection.id for inspection in inspections]
 
-    status_counts = Counter(inspection.status for inspection in inspections)
-    template_counts = Counter(
+    status_counts = _ordered_counts(inspection.status for inspection in inspections)
+    template_counts = _ordered_counts(
         (inspection.template.name if inspection.template else "Unspecified template")
         for inspection in inspections
     )
-    location_counts = Counter((inspection.location or "Unspecified location") for inspection in inspections)
+    location_counts = _ordered_counts((inspection.location or "Unspecified location") for inspection in inspections)
 
     scheduled_totals = {"scheduled": 0, "completed": 0}
     if inspections:
-        scheduled_totals["scheduled"] = (
-            db.query(func.count(ScheduledInspection.id))
-            .filter(ScheduledInspection.due_at >= start_dt, ScheduledInspection.due_at <= end_dt)
-            .scalar()
-            or 0
+        # Two independent aggregates in one round trip: slots due in the window, and report
+        # inspections that fulfilled any scheduled slot (wherever that slot's due date falls).
+        scheduled_count = (
+            select(func.count(ScheduledInspection.id))
+            .where(ScheduledInspection.due_at >= start_dt, ScheduledInspection.due_at <= end_dt)
+            .scalar_subquery()
         )
-        scheduled_totals["completed"] = (
-            db.query(func.count(Inspection.id))
+        completed_count = (
+            select(func.count(Inspection.id))
             .join(ScheduledInspection, Inspection.scheduled_inspection_id == ScheduledInspection.id)
-            .filter(Inspection.id.in_(inspection_ids))
-            .scalar()
-            or 0
+            .where(Inspection.id.in_(inspection_ids))
+            .scalar_subquery()
         )
+        scheduled, completed = db.query(scheduled_count, completed_count).one()
+        scheduled_totals["scheduled"] = scheduled or 0
+        scheduled_totals["completed"] = completed or 0
 
     open_actions_by_severity: dict[str, int] = {}
     overdue_actions_by_severity: dict[str, int] = {}
@@ -223,6 +251,7 @@ def build_inspections_range_summary(
                 CorrectiveAction.status != ActionStatus.closed.value,
             )
             .group_by(CorrectiveAction.severity)
+            .order_by(func.count(CorrectiveAction.id).desc(), CorrectiveAction.severity)
             .all()
         )
         for severity, count in open_rows:
@@ -237,6 +266,7 @@ def build_inspections_range_summary(
                 CorrectiveAction.due_date < now,
             )
             .group_by(CorrectiveAction.severity)
+            .order_by(func.count(CorrectiveAction.id).desc(), CorrectiveAction.severity)
             .all()
         )
         for severity, count in overdue_rows:
@@ -244,23 +274,23 @@ def build_inspections_range_summary(
 
     top_failures: list[dict[str, Any]] = []
     if inspection_ids:
+        failure_count = func.sum(case((InspectionResponse.result == "fail", 1), else_=0))
         failure_rows = (
             db.query(
                 TemplateItem.prompt,
                 func.count(InspectionResponse.id).label("total"),
-                func.sum(case((InspectionResponse.result == "fail", 1), else_=0)).label("failures"),
+                failure_count.label("failures"),
             )
             .join(TemplateItem, TemplateItem.id == InspectionResponse.template_item_id)
             .join(Inspection, Inspection.id == InspectionResponse.inspection_id)
             .filter(Inspection.id.in_(inspection_ids))
             .group_by(TemplateItem.id, TemplateItem.prompt)
-            .order_by(func.sum(case((InspectionResponse.result == "fail", 1), else_=0)).desc())
+            .having(failure_count > 0)
+            .order_by(failure_count.desc())
             .limit(limit_failures)
             .all()
         )
         for prompt, total, failures in failure_rows:
-            if not failures:
-                continue
             failure_rate = round((failures / total) * 100, 2) if total else 0.0
             top_failures.append({"prompt": prompt, "failures": failures, "fail_rate": failure_rate})
 
@@ -316,9 +346,7 @@ def generate_inspections_range_pdf(
     open_actions_by_severity = summary["open_actions_by_severity"]
     overdue_actions_by_severity = summary["overdue_actions_by_severity"]
     top_failures = summary["top_failures"]
-    pdf = FPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    pdf.add_page()
+    pdf = _new_report_pdf()
     pdf.set_font("Helvetica", "B", 16)
     pdf.cell(0, 10, "Inspection Summary Report", ln=True)
     pdf.set_font("Helvetica", size=11)
@@ -331,7 +359,7 @@ def generate_inspections_range_pdf(
     pdf.set_font("Helvetica", size=11)
     pdf.cell(0, 6, f"Total inspections: {len(inspections)}", ln=True)
     if status_counts:
-        for status, count in _summarize_counter(status_counts):
+        for status, count in status_counts.items():
             readable = status.replace("_", " ").title()
             pdf.cell(0, 6, f"- {readable}: {count}", ln=True)
     else:
@@ -356,7 +384,7 @@ def generate_inspections_range_pdf(
             pdf.cell(0, 6, "No data.", ln=True)
             pdf.ln(2)
             return
-        for label, count in _summarize_counter(data):
+        for label, count in data.items():
             pdf.cell(0, 6, f"- {label}: {count}", ln=True)
         pdf.ln(2)
 
@@ -368,13 +396,13 @@ def generate_inspections_range_pdf(
     pdf.set_font("Helvetica", size=11)
     if open_actions_by_severity:
         pdf.cell(0, 6, "Open issues:", ln=True)
-        for severity, count in _summarize_counter(open_actions_by_severity):
+        for severity, count in open_actions_by_severity.items():
             pdf.cell(0, 6, f"  - {severity.title()}: {count}", ln=True)
     else:
         pdf.cell(0, 6, "No open issues for this selection.", ln=True)
     if overdue_actions_by_severity:
         pdf.cell(0, 6, "Overdue issues:", ln=True)
-        for severity, count in _summarize_counter(overdue_actions_by_severity):
+        for severity, count in overdue_actions_by_severity.items():
             pdf.cell(0, 6, f"  - {severity.title()}: {count}", ln=True)
     pdf.ln(3)
 
@@ -392,7 +420,6 @@ def generate_inspections_range_pdf(
 
     pdf.set_font("Helvetica", "B", 13)
     pdf.cell(0, 8, "Inspection Details", ln=True)
-    pdf.set_font("Helvetica", "B", 11)
     column_defs = [
         ("ID", 12),
         ("Template", 50),
@@ -400,39 +427,40 @@ def generate_inspections_range_pdf(
         ("Location", 40),
         ("Submitted", 40),
     ]
-    for header, width in column_defs:
-        pdf.cell(width, 7, header, border=1)
-    pdf.ln()
+    rows = [
+        (
+            str(inspection.id),
+            _truncate_text(inspection.template.name if inspection.template else "Template"),
+            inspection.status.title(),
+            _truncate_text(inspection.location),
+            inspection.submitted_at.strftime("%Y-%m-%d %H:%M") if inspection.submitted_at else "-",
+        )
+        for inspection in inspections
+    ]
     pdf.set_font("Helvetica", size=10)
-    if inspections:
-        for inspection in inspections:
-            pdf.cell(column_defs[0][1], 6, str(inspection.id), border=1)
-            pdf.cell(
-                column_defs[1][1],
-                6,
-                _truncate_text(inspection.template.name if inspection.template else "Template"),
-                border=1,
-            )
-            pdf.cell(column_defs[2][1], 6, inspection.status.title(), border=1)
-            pdf.cell(
-                column_defs[3][1],
-                6,
-                _truncate_text(inspection.location or "—"),
-                border=1,
-            )
-            submitted = inspection.submitted_at.strftime("%Y-%m-%d %H:%M") if inspection.submitted_at else "-"
-            pdf.cell(column_defs[4][1], 6, submitted, border=1)
-            pdf.ln()
-    else:
+    with pdf.table(
+        align="LEFT",
+        col_widths=tuple(width for _, width in column_defs),
+        line_height=6,
+        text_align="LEFT",
+        width=sum(width for _, width in column_defs),
+    ) as table:
+        for values in [tuple(header for header, _ in column_defs), *rows]:
+            row = table.row()
+            for value in values:
+                row.cell(value)
+    if not rows:
         pdf.cell(0, 7, "No inspections to list.", border=1, ln=True)
 
     return _pdf_bytes(pdf)
 
 
-def _truncate_text(value: str, max_len: int = 24) -> str:
+def _truncate_text(value: str | None, max_len: int = 24) -> str:
+    if not value:
+        return "—"
     if len(value) <= max_len:
         return value
-    return f"{value[: max_len - 3]}..."
+    return value[: max_len - 3] + "..."
 
 
 def _pdf_bytes(pdf: FPDF) -> bytes:
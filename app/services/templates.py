@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
 
 from app.models.entities import ChecklistTemplate, TemplateItem, TemplateSection
 from app.schemas.template import (
@@ -17,21 +17,27 @@ def list_templates(db: Session) -> list[ChecklistTemplate]:
     return (
         db.query(ChecklistTemplate)
         .options(
-            selectinload(ChecklistTemplate.sections).selectinload(TemplateSection.items),
+            joinedload(ChecklistTemplate.sections).joinedload(TemplateSection.items),
+            raiseload("*"),
         )
         .all()
     )
 
 
-def get_template(db: Session, template_id: str) -> ChecklistTemplate | None:
-    return (
-        db.query(ChecklistTemplate)
-        .options(
-            selectinload(ChecklistTemplate.sections).selectinload(TemplateSection.items),
-        )
-        .filter(ChecklistTemplate.id == template_id)
-        .first()
+def get_template(db: Session, template_id: str, *, strict: bool = True) -> ChecklistTemplate | None:
+    """
+    Load a template with its sections/items.
+
+    ``strict`` blocks any other lazy relationship load; deletes pass ``strict=False``
+    because the ORM cascade has to visit inspections/assignments.
+    """
+
+    query = db.query(ChecklistTemplate).options(
+        joinedload(ChecklistTemplate.sections).joinedload(TemplateSection.items),
     )
+    if strict:
+        query = query.options(raiseload("*"))
+    return query.filter(ChecklistTemplate.id == template_id).first()
 
 
 def create_template(db: Session, payload: ChecklistTemplateCreate) -> ChecklistTemplate:
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from datetime import datetime, date, time
+from functools import lru_cache
+import importlib.util
 from pathlib import Path
+import re
 from typing import Any
 
 import pandas as pd
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -20,6 +23,7 @@ from app.models.entities import (  # noqa: E402
     InspectionResponse,
     InspectionStatus,
     TemplateItem,
+    TemplateSection,
     User,
     UserRole,
 )
@@ -42,6 +46,31 @@ ITEMS = [
     "Employee PPE",
     "MSD Hazards",
 ]
+ITEM_COLUMN_SUFFIXES = ("result", "issue_location", "issue", "corrective_action", "status")
+# Wide CSV column names per item, e.g. ITEM_COLUMNS["Trailers"]["result"] == "trailers_result".
+ITEM_COLUMNS = {
+    item: {suffix: f"{item.replace(' ', '_').lower()}_{suffix}" for suffix in ITEM_COLUMN_SUFFIXES}
+    for item in ITEMS
+}
+# Repeated short values parse straight into categoricals instead of one str object per cell.
+# inspection_date stays a string: the pyarrow engine would otherwise infer ISO dates as
+# datetime.date objects, which datetime.fromisoformat() rejects.
+CSV_DTYPES = {
+    "inspection_date": "string",
+    "inspector": "category",
+    **{columns["result"]: "category" for columns in ITEM_COLUMNS.values()},
+}
+# pyarrow's multithreaded CSV reader is much faster than the C parser; use it when installed.
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+# Guidance suffixes start at the first en dash or hyphen, e.g. "Trailers – What to look for:".
+_LABEL_SPLIT = re.compile(r"[–-]")
+# Issue columns folded into the response note, in order, with the label each line starts with.
+ISSUE_NOTE_PREFIXES = (
+    ("issue_location", "Location: "),
+    ("issue", ""),
+    ("corrective_action", "Legacy corrective action: "),
+    ("status", "Legacy status: "),
+)
 
 
 def ensure_user(session: Session, email: str) -> User:
@@ -59,23 +88,14 @@ def ensure_user(session: Session, email: str) -> User:
     return user
 
 
-def _combine_issue_info(row: pd.Series, prefix: str) -> str | None:
-    parts: list[str] = []
-    loc = row.get(f"{prefix}_issue_location")
-    issue = row.get(f"{prefix}_issue")
-    action = row.get(f"{prefix}_corrective_action")
-    status = row.get(f"{prefix}_status")
-    if pd.notna(loc) and str(loc).strip():
-        parts.append(f"Location: {loc}")
-    if pd.notna(issue) and str(issue).strip():
-        parts.append(str(issue))
-    if pd.notna(action) and str(action).strip():
-        parts.append(f"Legacy corrective action: {action}")
-    if pd.notna(status) and str(status).strip():
-        parts.append(f"Legacy status: {status}")
-    if not parts:
-        return None
-    return "\n".join(parts)
+def _issue_notes(df: pd.DataFrame, columns: dict[str, str]) -> pd.Series:
+    """Build the response note for one item across every row, or None where no issue info was given."""
+    notes = pd.Series(pd.NA, index=df.index, dtype="string")
+    for suffix, prefix in ISSUE_NOTE_PREFIXES:
+        raw = df[columns[suffix]].astype("string")
+        part = (prefix + raw).where(raw.str.strip().fillna("") != "")
+        notes = (notes + "\n" + part).fillna(notes).fillna(part)
+    return notes.astype(object).where(notes.notna(), None)
 
 
 def _result_value(raw: Any) -> str:
@@ -94,15 +114,21 @@ def _overall_score(results: list[str]) -> float:
 
 
 def _find_template(session: Session) -> ChecklistTemplate:
-    template = session.query(ChecklistTemplate).filter(ChecklistTemplate.name == TEMPLATE_NAME).first()
+    template = (
+        session.query(ChecklistTemplate)
+        .options(selectinload(ChecklistTemplate.sections).selectinload(TemplateSection.items))
+        .filter(ChecklistTemplate.name == TEMPLATE_NAME)
+        .first()
+    )
     if not template:
         raise RuntimeError(f"Template '{TEMPLATE_NAME}' not found. Create it before importing.")
     return template
 
 
+@lru_cache(maxsize=512)
 def _normalize_label(label: str) -> str:
     # Strip guidance suffixes like " – What to look for:"
-    return label.split("–")[0].split("-")[0].strip()
+    return _LABEL_SPLIT.split(label, maxsplit=1)[0].strip()
 
 
 def _get_item_lookup(template: ChecklistTemplate) -> dict[str, TemplateItem]:
@@ -113,32 +139,38 @@ def _get_item_lookup(template: ChecklistTemplate) -> dict[str, TemplateItem]:
     return lookup
 
 
-def _existing_inspection(session: Session, template_id: str, inspector_id: str, insp_date: date) -> Inspection | None:
-    candidates = (
-        session.query(Inspection)
-        .filter(Inspection.template_id == template_id, Inspection.inspector_id == inspector_id)
+def _existing_inspection_keys(session: Session, template_id: str) -> set[tuple[str, date]]:
+    """Return (inspector_id, started date) pairs already imported for the template."""
+    rows = (
+        session.query(Inspection.inspector_id, Inspection.started_at)
+        .filter(Inspection.template_id == template_id, Inspection.started_at.isnot(None))
         .all()
     )
-    for insp in candidates:
-        if insp.started_at and insp.started_at.date() == insp_date:
-            return insp
-    return None
+    return {(inspector_id, started_at.date()) for inspector_id, started_at in rows}
 
 
 def import_inspections(session: Session) -> dict[str, int]:
-    df = pd.read_csv(CSV_PATH, parse_dates=["started_at", "submitted_at"])
+    df = pd.read_csv(
+        CSV_PATH,
+        engine=CSV_ENGINE,
+        dtype=CSV_DTYPES,
+        parse_dates=["started_at", "submitted_at"],
+    )
     template = _find_template(session)
     item_lookup = _get_item_lookup(template)
+    existing_keys = _existing_inspection_keys(session, template.id)
+    # Notes are assembled column-wise up front; the row loop only reads the finished values.
+    item_notes = {item_name: _issue_notes(df, columns) for item_name, columns in ITEM_COLUMNS.items()}
 
     created = 0
     skipped = 0
-    for _, row in df.iterrows():
+    for index, row in df.iterrows():
         insp_date = datetime.fromisoformat(row["inspection_date"]).date()
         inspector_email = row["inspector"]
         inspector = ensure_user(session, inspector_email)
 
-        existing = _existing_inspection(session, template.id, inspector.id, insp_date)
-        if existing:
+        key = (inspector.id, insp_date)
+        if key in existing_keys:
             skipped += 1
             continue
 
@@ -164,15 +196,16 @@ def import_inspections(session: Session) -> dict[str, int]:
         )
         session.add(inspection)
         session.flush()
+        existing_keys.add((inspector.id, started_at.date()))
 
         results: list[str] = []
         for item_name in ITEMS:
             item = item_lookup.get(item_name)
             if not item:
                 raise RuntimeError(f"Template missing item '{item_name}' in '{TEMPLATE_NAME}'")
-            prefix = item_name.replace(" ", "_").lower()
-            result_val = _result_value(row.get(f"{prefix}_result"))
-            note_val = _combine_issue_info(row, prefix)
+            columns = ITEM_COLUMNS[item_name]
+            result_val = _result_value(row.get(columns["result"]))
+            note_val = item_notes[item_name].at[index]
             response = InspectionResponse(
                 inspection_id=inspection.id,
                 template_item_id=item.id,
@@ -190,7 +223,9 @@ def import_inspections(session: Session) -> dict[str, int]:
 
 
 def main() -> None:
-    session = SessionLocal()
+    # Bulk import: pin the session config so later changes to the app's sessionmaker
+    # cannot reintroduce pre-query flushes or post-commit reloads.
+    session = SessionLocal(autoflush=False, expire_on_commit=False)
     try:
         stats = import_inspections(session)
     finally:
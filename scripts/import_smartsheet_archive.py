@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from collections import Counter, defaultdict
+import importlib.util
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Mapping
 
+import numpy as np
 import pandas as pd
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 import sys
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,9 +29,45 @@ from app.models.entities import (  # noqa: E402
     TemplateSection,
     User,
     UserRole,
+    generate_uuid,
 )
 
 EXCEL_PATH = BASE_DIR / "docs" / "Inspection Grid Archive.xlsx"
+# Only these columns feed the import; projecting them skips parsing the rest of the sheet.
+EXCEL_COLUMNS = [
+    "Inspection Item..",
+    "Inspection Area",
+    "Inspected by",
+    "Inspection Date",
+    "Created",
+    "Rating Poor",
+    "Rating Good",
+    "Issue Location/Area",
+    "Issue",
+    "Corrective Action",
+    "Status",
+    "Risk Level",
+    "Severity of Occurrence",
+    "Likelihood of Occurring",
+    "Responsible to Complete",
+    "Assigned Due Date",
+    "Default Due Date",
+    "Close Date",
+    "Maintenance Work Order Required",
+    "Maintenance W.O.#",
+]
+# Low-cardinality text columns stored as categoricals instead of per-row Python strings.
+CATEGORY_COLUMNS = [
+    "Inspection Area",
+    "Risk Level",
+    "Severity of Occurrence",
+    "Likelihood of Occurring",
+    "Status",
+    "Inspected by",
+    "Responsible to Complete",
+]
+# python-calamine (Rust XLSX reader) is much faster than openpyxl; use it when installed.
+EXCEL_ENGINE = "calamine" if importlib.util.find_spec("python_calamine") else None
 DEFAULT_PASSWORD = "imported-change-me"
 
 RISK_TO_SEVERITY = {
@@ -44,23 +82,26 @@ COLOR_TO_SEVERITY = {
 }
 
 
-def _result_for_row(row: pd.Series) -> str:
-    if pd.notna(row.get("Rating Poor")) and float(row.get("Rating Poor", 0)) > 0:
-        return "fail"
-    if pd.notna(row.get("Rating Good")) and float(row.get("Rating Good", 0)) > 0:
-        return "pass"
-    return "pending"
+def _has_text(column: pd.Series) -> pd.Series:
+    return column.notna() & column.astype(str).str.strip().ne("")
 
 
-def _note_for_row(row: pd.Series) -> str | None:
-    bits: list[str] = []
-    if pd.notna(row.get("Issue Location/Area")):
-        bits.append(f"Location/Area: {row['Issue Location/Area']}")
-    if pd.notna(row.get("Issue")):
-        bits.append(str(row["Issue"]))
-    if pd.notna(row.get("Status")) and str(row["Status"]).strip():
-        bits.append(f"Legacy status: {row['Status']}")
-    return "\n".join(bits) if bits else None
+def _results(df: pd.DataFrame) -> np.ndarray:
+    poor = pd.to_numeric(df["Rating Poor"], errors="coerce").fillna(0) > 0
+    good = pd.to_numeric(df["Rating Good"], errors="coerce").fillna(0) > 0
+    return np.select([poor, good], ["fail", "pass"], default="pending")
+
+
+def _notes(df: pd.DataFrame) -> list[str | None]:
+    area = df["Issue Location/Area"]
+    issue = df["Issue"]
+    status = df["Status"]
+    parts = (
+        ("Location/Area: " + area.astype(str)).where(area.notna()),
+        issue.astype(str).where(issue.notna()),
+        ("Legacy status: " + status.astype(str)).where(_has_text(status)),
+    )
+    return ["\n".join(bit for bit in bits if isinstance(bit, str)) or None for bits in zip(*parts)]
 
 
 def _parse_datetime(value: Any) -> datetime | None:
@@ -72,7 +113,7 @@ def _parse_datetime(value: Any) -> datetime | None:
         return None
 
 
-def _severity_for_row(row: pd.Series) -> str:
+def _severity_for_row(row: Mapping[str, Any]) -> str:
     risk = row.get("Risk Level")
     if pd.notna(risk) and str(risk) in RISK_TO_SEVERITY:
         return RISK_TO_SEVERITY[str(risk)]
@@ -85,12 +126,9 @@ def _severity_for_row(row: pd.Series) -> str:
     return ActionSeverity.medium.value
 
 
-def _action_for_row(row: pd.Series) -> dict[str, Any] | None:
+def _action_for_row(row: Mapping[str, Any]) -> dict[str, Any]:
     has_action = pd.notna(row.get("Corrective Action")) and str(row["Corrective Action"]).strip()
     has_issue = pd.notna(row.get("Issue")) and str(row["Issue"]).strip()
-    needs_action = _result_for_row(row) == "fail"
-    if not (has_action or has_issue or needs_action):
-        return None
 
     title_source = str(row.get("Corrective Action") or "").strip() or str(row.get("Issue") or "").strip()
     title = title_source or f"Issue: {row.get('Inspection Item..')}"
@@ -127,40 +165,88 @@ def _action_for_row(row: pd.Series) -> dict[str, Any] | None:
 
 
 def load_dataframe() -> tuple[pd.DataFrame, dict[str, list[str]]]:
-    df = pd.read_excel(EXCEL_PATH, sheet_name="Inspection Grid Archive")
+    df = pd.read_excel(
+        EXCEL_PATH,
+        sheet_name="Inspection Grid Archive",
+        engine=EXCEL_ENGINE,
+        usecols=EXCEL_COLUMNS,
+    )
     df = df.dropna(subset=["Inspection Item..", "Inspection Area", "Inspected by", "Inspection Date"]).copy()
+    df[CATEGORY_COLUMNS] = df[CATEGORY_COLUMNS].astype("category")
     df["Created"] = pd.to_datetime(df["Created"])
     df["Inspection Date"] = pd.to_datetime(df["Inspection Date"]).dt.date
-    df["result"] = df.apply(_result_for_row, axis=1)
-    df["note"] = df.apply(_note_for_row, axis=1)
-    df["action_payload"] = df.apply(_action_for_row, axis=1)
+    df["result"] = _results(df)
+    df["note"] = _notes(df)
+
+    # Only rows with an action, an issue, or a failed rating become corrective actions;
+    # build payloads for those rows alone instead of calling back for every row.
+    needs_action = _has_text(df["Corrective Action"]) | _has_text(df["Issue"]) | (df["result"] == "fail")
+    positions = np.flatnonzero(needs_action.to_numpy())
+    payloads: list[dict[str, Any] | None] = [None] * len(df)
+    for position, record in zip(positions, df.iloc[positions].to_dict("records")):
+        payloads[position] = _action_for_row(record)
+    df["action_payload"] = payloads
 
     area_items = {
         area: sorted(group["Inspection Item.."].dropna().unique().tolist())
-        for area, group in df.groupby("Inspection Area")
+        for area, group in df.groupby("Inspection Area", observed=True)
     }
     return df, area_items
 
 
-def ensure_user(session: Session, email: str) -> User:
-    user = session.query(User).filter(User.email == email).first()
-    if user:
-        return user
+def ensure_users(session: Session, emails: list[str]) -> dict[str, User]:
+    """
+    Return users keyed by email, creating missing inspectors in a single flush.
+    """
+    users = {user.email: user for user in session.query(User).filter(User.email.in_(emails)).all()}
+    missing = [email for email in emails if email not in users]
+    if missing:
+        # Every imported account shares the same throwaway password, so hash it once.
+        hashed_password = get_password_hash(DEFAULT_PASSWORD)
+        new_users = [
+            User(
+                email=email,
+                full_name=email.split("@")[0],
+                role=UserRole.inspector.value,
+                hashed_password=hashed_password,
+            )
+            for email in missing
+        ]
+        session.add_all(new_users)
+        session.flush()
+        users.update((user.email, user) for user in new_users)
+    return users
+
+
+def _template_name(area: str) -> str:
+    return f"{area} Legacy H&S"
 
-    user = User(
-        email=email,
-        full_name=email.split("@")[0],
-        role=UserRole.inspector.value,
-        hashed_password=get_password_hash(DEFAULT_PASSWORD),
+
+def ensure_templates(session: Session, area_items: dict[str, list[str]]) -> dict[str, ChecklistTemplate]:
+    """
+    Return legacy templates keyed by area, loading existing ones with a single query.
+    """
+    names = [_template_name(area) for area in area_items]
+    query = (
+        session.query(ChecklistTemplate)
+        .options(selectinload(ChecklistTemplate.sections).selectinload(TemplateSection.items))
+        .filter(ChecklistTemplate.name.in_(names))
     )
-    session.add(user)
-    session.flush()
-    return user
+    existing = {template.name: template for template in query.all()}
+    return {
+        area: existing.get(_template_name(area)) or ensure_template(session, area, prompts)
+        for area, prompts in area_items.items()
+    }
 
 
 def ensure_template(session: Session, area: str, prompts: list[str]) -> ChecklistTemplate:
-    name = f"{area} Legacy H&S"
-    template = session.query(ChecklistTemplate).filter(ChecklistTemplate.name == name).first()
+    name = _template_name(area)
+    template = (
+        session.query(ChecklistTemplate)
+        .options(selectinload(ChecklistTemplate.sections).selectinload(TemplateSection.items))
+        .filter(ChecklistTemplate.name == name)
+        .first()
+    )
     if template:
         return template
 
@@ -189,79 +275,109 @@ def _overall_score(results: list[str]) -> float:
 
 
 def import_inspections(session: Session, df: pd.DataFrame, area_items: dict[str, list[str]]) -> dict[str, Any]:
-    grouped = df.sort_values("Created").groupby(["Inspection Area", "Inspection Date", "Inspected by"])
+    grouped = df.sort_values("Created").groupby(
+        ["Inspection Area", "Inspection Date", "Inspected by"],
+        observed=True,
+    )
     stats: dict[str, Any] = {"created": 0, "per_area": Counter(), "pending_gaps": []}
+    users = ensure_users(session, df["Inspected by"].dropna().unique().tolist())
+    templates = ensure_templates(session, area_items)
+
+    # Pass 1 builds every row in memory; each response/action remembers the position of its
+    # parent inspection so the ids can be filled in after the inspections are inserted.
+    inspection_rows: list[dict[str, Any]] = []
+    response_rows: list[dict[str, Any]] = []
+    response_parents: list[int] = []
+    action_rows: list[dict[str, Any]] = []
+    action_parents: list[int] = []
+    # groupby sorts by area first, so the item list only changes when the area does.
+    current_area: str | None = None
+    current_items: list[TemplateItem] = []
 
     for (area, insp_date, inspector_email), group in grouped:
         dedup = group.sort_values("Created").groupby("Inspection Item..").tail(1)
         created_min = dedup["Created"].min()
         created_max = dedup["Created"].max()
-        inspector = ensure_user(session, inspector_email)
-        template = ensure_template(session, area, area_items[area])
-
-        inspection = Inspection(
-            template_id=template.id,
-            inspector_id=inspector.id,
-            created_by_id=inspector.id,
-            status=InspectionStatus.submitted.value,
-            inspection_origin=InspectionOrigin.independent.value,
-            location=area,
-            notes=(
-                f"Imported from Smartsheet on {datetime.utcnow().date().isoformat()} "
-                f"(area: {area}, legacy date: {insp_date.isoformat()}, inspector: {inspector_email})"
-            ),
-            started_at=created_min.to_pydatetime() if hasattr(created_min, "to_pydatetime") else datetime.combine(
-                insp_date, datetime.min.time()
-            ),
-            submitted_at=created_max.to_pydatetime() if hasattr(created_max, "to_pydatetime") else None,
+        inspector = users[inspector_email]
+        template = templates[area]
+        if area != current_area:
+            current_area, current_items = area, template.sections[0].items
+        parent = len(inspection_rows)
+
+        # Only the derived columns are needed per item; named tuples avoid building a Series per row.
+        prompt_to_row = dict(
+            zip(
+                dedup["Inspection Item.."],
+                dedup[["result", "note", "action_payload"]].itertuples(index=False),
+            )
         )
-        session.add(inspection)
-        session.flush()
-
-        prompt_to_row = {row["Inspection Item.."]: row for _, row in dedup.iterrows()}
         results: list[str] = []
         missing_prompts: list[str] = []
-        for item in template.sections[0].items:
+        for item in current_items:
             row = prompt_to_row.get(item.prompt)
+            # Response ids are UUIDs, so they can be assigned up front and linked to
+            # actions without a flush per response.
+            response_id = generate_uuid()
+            response_parents.append(parent)
             if row is None:
-                response = InspectionResponse(
-                    inspection_id=inspection.id,
-                    template_item_id=item.id,
-                    result="pending",
-                    note="Missing from legacy export",
+                response_rows.append(
+                    {
+                        "id": response_id,
+                        "template_item_id": item.id,
+                        "result": "pending",
+                        "note": "Missing from legacy export",
+                    }
                 )
                 missing_prompts.append(item.prompt)
-            else:
-                response = InspectionResponse(
-                    inspection_id=inspection.id,
-                    template_item_id=item.id,
-                    result=row["result"],
-                    note=row["note"],
+                continue
+
+            response_rows.append(
+                {
+                    "id": response_id,
+                    "template_item_id": item.id,
+                    "result": row.result,
+                    "note": row.note,
+                }
+            )
+            payload = row.action_payload
+            if payload:
+                action_parents.append(parent)
+                action_rows.append(
+                    {
+                        "response_id": response_id,
+                        "title": payload["title"],
+                        "description": payload["description"],
+                        "severity": payload["severity"],
+                        "due_date": payload["due_date"],
+                        "status": payload["status"],
+                        "closed_at": payload["closed_at"],
+                        "started_by_id": inspector.id,
+                        "closed_by_id": inspector.id if payload["status"] == ActionStatus.closed.value else None,
+                        "work_order_required": payload["work_order_required"],
+                        "work_order_number": payload["work_order_number"],
+                    }
                 )
-                session.add(response)
-                session.flush()
-                if row["action_payload"]:
-                    payload = row["action_payload"]
-                    action = CorrectiveAction(
-                        inspection_id=inspection.id,
-                        response_id=response.id,
-                        title=payload["title"],
-                        description=payload["description"],
-                        severity=payload["severity"],
-                        due_date=payload["due_date"],
-                        status=payload["status"],
-                        closed_at=payload["closed_at"],
-                        started_by_id=inspector.id,
-                        closed_by_id=inspector.id if payload["status"] == ActionStatus.closed.value else None,
-                        work_order_required=payload["work_order_required"],
-                        work_order_number=payload["work_order_number"],
-                    )
-                    session.add(action)
-                results.append(row["result"])
-            if response.id is None:
-                session.add(response)
-
-        inspection.overall_score = _overall_score(results)
+            results.append(row.result)
+
+        inspection_rows.append(
+            {
+                "template_id": template.id,
+                "inspector_id": inspector.id,
+                "created_by_id": inspector.id,
+                "status": InspectionStatus.submitted.value,
+                "inspection_origin": InspectionOrigin.independent.value,
+                "location": area,
+                "notes": (
+                    f"Imported from Smartsheet on {datetime.utcnow().date().isoformat()} "
+                    f"(area: {area}, legacy date: {insp_date.isoformat()}, inspector: {inspector_email})"
+                ),
+                "started_at": created_min.to_pydatetime()
+                if hasattr(created_min, "to_pydatetime")
+                else datetime.combine(insp_date, datetime.min.time()),
+                "submitted_at": created_max.to_pydatetime() if hasattr(created_max, "to_pydatetime") else None,
+                "overall_score": _overall_score(results),
+            }
+        )
         stats["created"] += 1
         stats["per_area"][area] += 1
         if missing_prompts:
@@ -274,13 +390,27 @@ def import_inspections(session: Session, df: pd.DataFrame, area_items: dict[str,
                 }
             )
 
+    # Pass 2: inspections first so their generated ids can be copied onto the child rows,
+    # then one bulk insert per child table, all in a single transaction.
+    if inspection_rows:
+        session.bulk_insert_mappings(Inspection, inspection_rows, return_defaults=True)
+        for row, parent in zip(response_rows, response_parents):
+            row["inspection_id"] = inspection_rows[parent]["id"]
+        for row, parent in zip(action_rows, action_parents):
+            row["inspection_id"] = inspection_rows[parent]["id"]
+        session.bulk_insert_mappings(InspectionResponse, response_rows)
+        if action_rows:
+            session.bulk_insert_mappings(CorrectiveAction, action_rows)
+
     session.commit()
     return stats
 
 
 def main() -> None:
     df, area_items = load_dataframe()
-    session = SessionLocal()
+    # Bulk import: pin the session config so later changes to the app's sessionmaker
+    # cannot reintroduce pre-query flushes or post-commit reloads.
+    session = SessionLocal(autoflush=False, expire_on_commit=False)
     try:
         stats = import_inspections(session, df, area_items)
     finally:
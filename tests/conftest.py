@@ -1,35 +1,96 @@
 from __future__ import annotations
 
+from functools import lru_cache
 import os
 from pathlib import Path
 import sys
+from typing import Dict, Iterator
 
 import pytest
 from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
 
-# Ensure the application uses an isolated SQLite database for tests
-os.environ["SQLITE_URL"] = "sqlite:///./test_app.db"
+# Ensure the application uses an isolated, in-memory SQLite database for tests. It lives
+# and dies with the process, so every pytest-xdist worker gets its own copy.
+os.environ["SQLITE_URL"] = "sqlite://"
 # Ensure deterministic secrets and demo data for tests
 os.environ.setdefault("JWT_SECRET", "test-secret-please-change")
 os.environ.setdefault("SEED_INITIAL_DATA", "1")
 os.environ.setdefault("RUN_MIGRATIONS_ON_STARTUP", "1")
+# Cheapest bcrypt cost for runs that opt back into real hashing (TEST_REAL_PASSWORD_HASHING=1)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from app.core import security  # noqa: E402
+from app.services import files as files_service  # noqa: E402
 from app.main import app  # noqa: E402
-from app.core.database import engine  # noqa: E402
+from app.core.database import SessionLocal, engine  # noqa: E402
 
-TEST_DB_PATH = Path("test_app.db")
 
+# pysqlite defers BEGIN on its own, which breaks SAVEPOINT handling; let SQLAlchemy
+# emit BEGIN itself so each test can be rolled back to a savepoint.
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, _connection_record) -> None:
+    dbapi_connection.isolation_level = None
 
-@pytest.fixture()
-def client() -> TestClient:
-    if TEST_DB_PATH.exists():
-        TEST_DB_PATH.unlink()
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection) -> None:
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def fast_password_hashing() -> Iterator[None]:
+    """Swap bcrypt for plaintext hashes; every user in the test database is created under it."""
+    with pytest.MonkeyPatch.context() as patcher:
+        if os.environ.get("TEST_REAL_PASSWORD_HASHING") == "1":
+            # Real bcrypt: hash each distinct test password once; a reused salt still verifies.
+            patcher.setattr(security.pwd_context, "hash", lru_cache(maxsize=64)(security.pwd_context.hash))
+        else:
+            patcher.setattr(security, "pwd_context", CryptContext(schemes=["plaintext"]))
+        yield
+
+
+@pytest.fixture(scope="session")
+def client(fast_password_hashing: None) -> Iterator[TestClient]:
     with TestClient(app) as test_client:
+        # Entering the client ran startup; one request also warms the middleware and routing
+        # stack so that cost is not billed to whichever test happens to run first.
+        assert test_client.get("/health").status_code == 200
         yield test_client
     engine.dispose()
-    if TEST_DB_PATH.exists():
-        TEST_DB_PATH.unlink()
+
+
+@pytest.fixture(scope="session")
+def db_connection(client: TestClient) -> Iterator[Connection]:
+    """Bind every SessionLocal() to one connection whose transaction is never committed."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Fixtures read ids off committed objects, so pin expire_on_commit rather than rely
+    # on the app's sessionmaker default staying False.
+    SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint", expire_on_commit=False)
+    yield connection
+    SessionLocal.configure(bind=engine, join_transaction_mode="conservative_savepoint")
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(autouse=True)
+def _rollback_database(db_connection: Connection) -> Iterator[None]:
+    """Undo everything a test wrote, including app-side commits, via a savepoint."""
+    savepoint = db_connection.begin_nested()
+    yield
+    savepoint.rollback()
+
+
+@pytest.fixture(autouse=True)
+def media_store(monkeypatch: pytest.MonkeyPatch) -> Dict[str, bytes]:
+    """Keep uploaded bytes in memory so tests never write into the real uploads directory."""
+    stored: Dict[str, bytes] = {}
+    monkeypatch.setattr(files_service, "_store_media_bytes", stored.__setitem__)
+    return stored
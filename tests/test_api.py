@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
-from typing import Dict, List
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+import importlib
+from itertools import chain
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+import pytest
 
 from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, engine
 from app.core.security import get_password_hash
 from app.models.entities import (
     ActionSeverity,
@@ -18,13 +29,30 @@ from app.models.entities import (
     InspectionResponse,
     InspectionStatus,
     Location,
+    ScheduledInspection,
+    TemplateSection,
     User,
     UserRole,
 )
+from app.schemas.template import ChecklistTemplateRead
 from app.services import reports as report_service
+from app.services import templates as template_service
 
 ASSIGNEE_EMAIL = "supervisor@example.com"
 ASSIGNEE_PASSWORD = "supervisorpass"
+TEMP_INSPECTOR_EMAIL = "temp_inspector@example.com"
+# Users the tests add on top of the seed data, created together in one INSERT.
+TEMP_USERS = {ASSIGNEE_EMAIL: ASSIGNEE_PASSWORD, TEMP_INSPECTOR_EMAIL: "temppass"}
+AuthHeaders = Dict[str, Dict[str, str]]
+# Request bodies reused verbatim across calls.
+SUBMIT_PAYLOAD = {"status": "submitted"}
+CLOSE_WITH_NOTES = {"status": "closed", "resolution_notes": "Cleared obstruction"}
+KNOWN_USERS = {
+    "admin": ("admin@example.com", "adminpass"),
+    "inspector": ("inspector@example.com", "inspectorpass"),
+    "reviewer": ("reviewer@example.com", "reviewerpass"),
+    "supervisor": (ASSIGNEE_EMAIL, ASSIGNEE_PASSWORD),
+}
 
 def authenticate(client: TestClient, username: str, password: str) -> Dict[str, str]:
     response = client.post(
@@ -37,106 +65,258 @@ def authenticate(client: TestClient, username: str, password: str) -> Dict[str,
     return {"Authorization": f"Bearer {token}"}
 
 
-def create_temp_inspector(email: str, password: str) -> None:
-    with SessionLocal() as db:
-        if db.query(User).filter(User.email == email).first():
-            return
-        user = User(
-            email=email,
-            full_name="Temp Inspector",
-            role=UserRole.inspector.value,
-            hashed_password=get_password_hash(password),
-        )
-        db.add(user)
-        db.commit()
+TRANSACTION_STATEMENTS = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")
 
 
-def ensure_assigned_supervisor(email: str = ASSIGNEE_EMAIL, password: str = ASSIGNEE_PASSWORD) -> None:
-    create_temp_inspector(email, password)
+@contextmanager
+def count_queries() -> Iterator[List[str]]:
+    statements: List[str] = []
 
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        # The per-test savepoint wrapper adds transaction control; only count real work.
+        if not statement.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            statements.append(statement)
 
-def create_action_for_owner(owner_email: str = ASSIGNEE_EMAIL) -> int:
-    ensure_assigned_supervisor(owner_email, ASSIGNEE_PASSWORD)
-    create_submitted_inspection()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+class TemplateMeta(NamedTuple):
+    id: str
+    name: str
+    item_ids: List[str]
+
+
+class SeedIds(NamedTuple):
+    template_id: str
+    inspector_id: str
+    fail_item_id: str
+    pass_item_id: str
+
+
+def create_temp_inspectors(credentials: Dict[str, str]) -> Dict[str, str]:
+    """Insert every missing temp inspector with one INSERT and return user ids keyed by email."""
+    lookup = select(User.email, User.id).where(User.email.in_(credentials))
     with SessionLocal() as db:
-        owner = db.query(User).filter(User.email == owner_email).first()
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
-        inspection = db.query(Inspection).first()
-        assert owner is not None
-        assert inspector is not None
-        assert inspection is not None
-        action = CorrectiveAction(
-            inspection_id=inspection.id,
-            title="Repair guard rail",
-            severity=ActionSeverity.medium.value,
-            occurrence_severity=ActionSeverity.medium.value,
-            injury_severity=ActionSeverity.medium.value,
-            status=ActionStatus.open.value,
-            started_by_id=inspector.id,
-            assigned_to_id=owner.id,
-        )
-        db.add(action)
-        db.commit()
-        db.refresh(action)
-        return action.id
+        # A second pass only runs when someone sharing the database inserted one of the emails
+        # first: the failed batch rolled back whole, so re-read and insert whatever is still missing.
+        for attempt in range(2):
+            ids: Dict[str, str] = {email: user_id for email, user_id in db.execute(lookup)}
+            missing = [
+                {
+                    "email": email,
+                    "full_name": "Temp Inspector",
+                    "role": UserRole.inspector.value,
+                    "hashed_password": get_password_hash(password),
+                }
+                for email, password in credentials.items()
+                if email not in ids
+            ]
+            if not missing:
+                break
+            try:
+                inserted = db.execute(insert(User).returning(User.email, User.id), missing)
+                ids.update({email: user_id for email, user_id in inserted})
+                db.commit()
+                break
+            except IntegrityError:
+                db.rollback()
+                if attempt:
+                    raise
+    assert ids.keys() == credentials.keys()
+    return ids
+
+
+# Session-scoped seed data is written inside the session transaction before any per-test
+# savepoint opens, so it survives the rollbacks and is created once per run.
+@pytest.fixture(scope="session")
+def temp_user_ids(db_connection: Connection) -> Dict[str, str]:
+    return create_temp_inspectors(TEMP_USERS)
+
+
+@pytest.fixture(scope="session")
+def action_owner(temp_user_ids: Dict[str, str]) -> str:
+    return temp_user_ids[ASSIGNEE_EMAIL]
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client: TestClient, action_owner: str) -> AuthHeaders:
+    """Log every known user in once; tokens outlive the suite (ACCESS_TOKEN_EXPIRE_MINUTES)."""
+    return {role: authenticate(client, email, password) for role, (email, password) in KNOWN_USERS.items()}
+
+
+@pytest.fixture(scope="session")
+def template_meta(client: TestClient, auth_headers: AuthHeaders) -> TemplateMeta:
+    """The first template as the API lists it, fetched once instead of per test."""
+    template = client.get("/templates/", headers=auth_headers["admin"]).json()[0]
+    item_ids = list(map(itemgetter("id"), chain.from_iterable(map(itemgetter("items"), template["sections"]))))
+    return TemplateMeta(template["id"], template["name"], item_ids)
+
+
+@pytest.fixture(scope="session")
+def temp_inspector(client: TestClient, temp_user_ids: Dict[str, str]) -> Tuple[str, str, Dict[str, str]]:
+    email, password = TEMP_INSPECTOR_EMAIL, TEMP_USERS[TEMP_INSPECTOR_EMAIL]
+    return email, password, authenticate(client, email, password)
+
+
+@pytest.fixture(scope="session")
+def user_ids(action_owner: str) -> Dict[str, str]:
+    """Resolve every known user's id by role with one IN query."""
+    roles = {email: role for role, (email, _) in KNOWN_USERS.items()}
+    with SessionLocal() as db:
+        rows = db.execute(select(User.email, User.id).where(User.email.in_(roles))).all()
+    ids = {roles[email]: user_id for email, user_id in rows}
+    assert ids.keys() == KNOWN_USERS.keys()
+    return ids
 
 
-def create_submitted_inspection(location: str = "Hangar A", *, persist_location: bool = False) -> date:
-    submitted_at = datetime.utcnow()
+@pytest.fixture(scope="session")
+def base_inspection_ids(user_ids: Dict[str, str]) -> SeedIds:
     with SessionLocal() as db:
-        template = db.query(ChecklistTemplate).first()
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
+        template = db.scalars(
+            select(ChecklistTemplate).options(
+                selectinload(ChecklistTemplate.sections).selectinload(TemplateSection.items)
+            )
+        ).first()
         assert template is not None
-        assert inspector is not None
-        location_row: Location | None = None
-        if persist_location:
-            location_row = db.query(Location).filter(Location.name == location).first()
-            if not location_row:
-                location_row = Location(name=location)
-                db.add(location_row)
-                db.flush()
-        inspection = Inspection(
-            template_id=template.id,
-            inspector_id=inspector.id,
-            created_by_id=inspector.id,
-            status=InspectionStatus.submitted.value,
-            location=location,
-            location_id=location_row.id if location_row else None,
-            started_at=submitted_at,
-            submitted_at=submitted_at,
-            overall_score=89.5,
-            inspection_origin=InspectionOrigin.independent.value,
-        )
-        db.add(inspection)
-        db.flush()
-        first_item = template.sections[0].items[0]
-        second_item = template.sections[0].items[1]
-        fail_response = InspectionResponse(
-            inspection_id=inspection.id,
-            template_item_id=first_item.id,
-            result="fail",
-            note="Exit blocked",
-        )
-        pass_response = InspectionResponse(
-            inspection_id=inspection.id,
-            template_item_id=second_item.id,
-            result="pass",
-        )
-        db.add_all([fail_response, pass_response])
-        db.flush()
-        action = CorrectiveAction(
-            inspection_id=inspection.id,
-            response_id=fail_response.id,
-            title="Clear exit",
-            severity=ActionSeverity.high.value,
-            status=ActionStatus.open.value,
-            due_date=submitted_at - timedelta(days=2),
-            started_by_id=inspector.id,
-            assigned_to_id=inspector.id,
+        items = template.sections[0].items
+        return SeedIds(template.id, user_ids["inspector"], items[0].id, items[1].id)
+
+
+@pytest.fixture
+def now() -> datetime:
+    """One UTC wall-clock reading per test, so every derived date agrees with the others."""
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def add_submitted_inspection(
+    db: Session,
+    ids: SeedIds,
+    location: str = "Hangar A",
+    *,
+    persist_location: bool = False,
+) -> Inspection:
+    """Stage a submitted inspection with one failed item and its open action; the caller commits."""
+    submitted_at = datetime.utcnow()
+    location_row: Location | None = None
+    if persist_location:
+        location_row = db.query(Location).filter(Location.name == location).first() or Location(name=location)
+    # Link rows through relationships so the unit of work orders the INSERTs and fills
+    # in the foreign keys in a single flush at commit.
+    inspection = Inspection(
+        template_id=ids.template_id,
+        inspector_id=ids.inspector_id,
+        created_by_id=ids.inspector_id,
+        status=InspectionStatus.submitted.value,
+        location=location,
+        location_ref=location_row,
+        started_at=submitted_at,
+        submitted_at=submitted_at,
+        overall_score=89.5,
+        inspection_origin=InspectionOrigin.independent.value,
+    )
+    fail_response = InspectionResponse(
+        inspection=inspection,
+        template_item_id=ids.fail_item_id,
+        result="fail",
+        note="Exit blocked",
+    )
+    pass_response = InspectionResponse(
+        inspection=inspection,
+        template_item_id=ids.pass_item_id,
+        result="pass",
+    )
+    action = CorrectiveAction(
+        inspection=inspection,
+        response=fail_response,
+        title="Clear exit",
+        severity=ActionSeverity.high.value,
+        status=ActionStatus.open.value,
+        due_date=submitted_at - timedelta(days=2),
+        started_by_id=ids.inspector_id,
+        assigned_to_id=ids.inspector_id,
+    )
+    db.add_all([inspection, fail_response, pass_response, action])
+    return inspection
+
+
+@pytest.fixture
+def create_submitted_inspection(base_inspection_ids: SeedIds) -> Callable[..., date]:
+    def _create(location: str = "Hangar A", *, persist_location: bool = False) -> date:
+        with SessionLocal.begin() as db:
+            inspection = add_submitted_inspection(
+                db,
+                base_inspection_ids,
+                location,
+                persist_location=persist_location,
+            )
+        return inspection.submitted_at.date()
+
+    return _create
+
+
+@pytest.fixture(scope="session")
+def report_date(base_inspection_ids: SeedIds) -> date:
+    """Seed the report tests' submitted inspection (at Hangar B) once and return its date."""
+    with SessionLocal.begin() as db:
+        inspection = add_submitted_inspection(db, base_inspection_ids, "Hangar B")
+    return inspection.submitted_at.date()
+
+
+@pytest.fixture
+def create_action_for_owner(action_owner: str, base_inspection_ids: SeedIds) -> Callable[[], int]:
+    def _create() -> int:
+        # The owner's action rides on a fresh submitted inspection; both land in one commit.
+        with SessionLocal.begin() as db:
+            inspection = add_submitted_inspection(db, base_inspection_ids)
+            action = CorrectiveAction(
+                inspection=inspection,
+                title="Repair guard rail",
+                severity=ActionSeverity.medium.value,
+                occurrence_severity=ActionSeverity.medium.value,
+                injury_severity=ActionSeverity.medium.value,
+                status=ActionStatus.open.value,
+                started_by_id=base_inspection_ids.inspector_id,
+                assigned_to_id=action_owner,
+            )
+            db.add(action)
+        # The session leaves the block committed and closed; the flushed id stays loaded.
+        return action.id
+
+    return _create
+
+
+@pytest.fixture
+def draft_inspection(client: TestClient, auth_headers: AuthHeaders, template_meta: TemplateMeta) -> Dict[str, Any]:
+    response = client.post("/inspections/", json={"template_id": template_meta.id}, headers=auth_headers["inspector"])
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.fixture
+def failed_response(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    template_meta: TemplateMeta,
+    draft_inspection: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Answer the first three checklist items pass/fail/pass and return the failed response."""
+
+    results = dict(zip(template_meta.item_ids[:3], ("pass", "fail", "pass")))
+    failed: Dict[str, Any] = {}
+    for item_id, result in results.items():
+        response = client.post(
+            f"/inspections/{draft_inspection['id']}/responses",
+            json={"template_item_id": item_id, "result": result, "media_urls": []},
+            headers=auth_headers["inspector"],
         )
-        db.add(action)
-        db.commit()
-    return submitted_at.date()
+        assert response.status_code == 201
+        if result == "fail":
+            failed = response.json()
+    return failed
 
 
 def test_login_returns_jwt(client: TestClient) -> None:
@@ -144,17 +324,44 @@ def test_login_returns_jwt(client: TestClient) -> None:
     assert "Authorization" in headers
 
 
-def test_template_listing_requires_auth(client: TestClient) -> None:
+def test_template_listing_requires_auth(client: TestClient, auth_headers: AuthHeaders) -> None:
     response = client.get("/templates/")
     assert response.status_code == 401
-    headers = authenticate(client, "admin@example.com", "adminpass")
-    authed = client.get("/templates/", headers=headers)
+    headers = auth_headers["admin"]
+    with count_queries() as statements:
+        authed = client.get("/templates/", headers=headers)
     assert authed.status_code == 200
     assert isinstance(authed.json(), list)
+    # The current-user lookup plus one joined query for the whole template tree.
+    assert len(statements) == 2
 
 
-def test_actions_dashboard_available_to_inspector(client: TestClient) -> None:
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
+def test_template_loaders_use_fixed_query_count(client: TestClient) -> None:
+    with SessionLocal() as db:
+        with count_queries() as statements:
+            templates = template_service.list_templates(db)
+            # Serialization must not trigger lazy loads beyond the eager tree.
+            listing = [ChecklistTemplateRead.model_validate(template) for template in templates]
+        assert listing and listing[0].sections
+        assert len(statements) == 1
+
+        with count_queries() as statements:
+            detail = template_service.get_template(db, listing[0].id)
+            assert detail is not None
+            ChecklistTemplateRead.model_validate(detail)
+        assert len(statements) == 1
+
+
+def test_seed_helper_query_budget(create_submitted_inspection: Callable[..., date]) -> None:
+    # One INSERT each for the inspection, its responses and its action, plus headroom for one
+    # more; a lazy load or per-row round-trip sneaking into the helper blows straight past it.
+    with count_queries() as statements:
+        create_submitted_inspection()
+    assert len(statements) <= 4, statements
+
+
+def test_actions_dashboard_available_to_inspector(client: TestClient, auth_headers: AuthHeaders) -> None:
+    headers = auth_headers["inspector"]
     response = client.get("/dash/actions", headers=headers)
     assert response.status_code == 200
     payload = response.json()
@@ -162,8 +369,8 @@ def test_actions_dashboard_available_to_inspector(client: TestClient) -> None:
     assert "overdue_actions" in payload
 
 
-def test_assignee_listing_available_to_all_active_users(client: TestClient) -> None:
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
+def test_assignee_listing_available_to_all_active_users(client: TestClient, auth_headers: AuthHeaders) -> None:
+    headers = auth_headers["inspector"]
     response = client.get("/users/assignees", headers=headers)
     assert response.status_code == 200
     payload = response.json()
@@ -174,70 +381,67 @@ def test_assignee_listing_available_to_all_active_users(client: TestClient) -> N
     assert "inspector@example.com" in emails
 
 
-def test_inspection_submission_rules(client: TestClient) -> None:
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
-
-    templates = client.get("/templates/", headers=headers).json()
-    template = templates[0]
-    template_id = template["id"]
-    template_name = template["name"]
-    items: List[str] = [item["id"] for section in template["sections"] for item in section["items"]]
+def test_inspection_created_as_independent_draft(draft_inspection: Dict[str, Any]) -> None:
+    assert draft_inspection["created_by"]["full_name"] == "Inspector One"
+    assert draft_inspection["inspection_origin"] == "independent"
 
-    inspection = client.post("/inspections/", json={"template_id": template_id}, headers=headers).json()
-    inspection_id = inspection["id"]
-    assert inspection["created_by"]["full_name"] == "Inspector One"
-    assert inspection["inspection_origin"] == "independent"
 
-    submit = client.put(f"/inspections/{inspection_id}", json={"status": "submitted"}, headers=headers)
+def test_submit_requires_responses(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    draft_inspection: Dict[str, Any],
+) -> None:
+    submit = client.put(
+        f"/inspections/{draft_inspection['id']}",
+        json=SUBMIT_PAYLOAD,
+        headers=auth_headers["inspector"],
+    )
     assert submit.status_code == 400
 
-    pass_resp = client.post(
-        f"/inspections/{inspection_id}/responses",
-        json={"template_item_id": items[0], "result": "pass", "media_urls": []},
-        headers=headers,
-    )
-    assert pass_resp.status_code == 201
 
-    fail_resp = client.post(
-        f"/inspections/{inspection_id}/responses",
-        json={"template_item_id": items[1], "result": "fail", "media_urls": []},
-        headers=headers,
-    ).json()
-
-    client.post(
-        f"/inspections/{inspection_id}/responses",
-        json={"template_item_id": items[2], "result": "pass", "media_urls": []},
-        headers=headers,
+def test_submit_requires_action_for_failed_item(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    draft_inspection: Dict[str, Any],
+    failed_response: Dict[str, Any],
+) -> None:
+    submit = client.put(
+        f"/inspections/{draft_inspection['id']}",
+        json=SUBMIT_PAYLOAD,
+        headers=auth_headers["inspector"],
     )
+    assert submit.status_code == 400
 
-    submit_without_action = client.put(
-        f"/inspections/{inspection_id}",
-        json={"status": "submitted"},
-        headers=headers,
-    )
-    assert submit_without_action.status_code == 400
 
+def test_action_on_failed_response_records_starter_and_assignee(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    draft_inspection: Dict[str, Any],
+    failed_response: Dict[str, Any],
+) -> None:
     action_payload = {
-        "inspection_id": inspection_id,
-        "response_id": fail_resp["id"],
+        "inspection_id": draft_inspection["id"],
+        "response_id": failed_response["id"],
         "title": "Fix exit",
         "description": "Clear obstruction",
         "severity": "high",
         "status": "open",
-        "assigned_to_id": inspection["created_by"]["id"],
+        "assigned_to_id": draft_inspection["created_by"]["id"],
     }
-    action_resp = client.post("/actions/", json=action_payload, headers=headers)
+    action_resp = client.post("/actions/", json=action_payload, headers=auth_headers["inspector"])
     assert action_resp.status_code == 201
     action_body = action_resp.json()
     assert action_body["started_by"]["email"] == "inspector@example.com"
-    assert action_body["assignee"]["id"] == inspection["created_by"]["id"]
-    action_id = action_body["id"]
+    assert action_body["assignee"]["id"] == draft_inspection["created_by"]["id"]
 
 
-def test_inspector_can_delete_draft_inspection(client: TestClient) -> None:
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
-    templates = client.get("/templates/", headers=headers).json()
-    template_id = templates[0]["id"]
+def test_inspector_can_delete_draft_inspection(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    template_meta: TemplateMeta,
+) -> None:
+    headers = auth_headers["inspector"]
+    template_id = template_meta.id
 
     created = client.post("/inspections/", json={"template_id": template_id}, headers=headers)
     assert created.status_code == 201
@@ -250,8 +454,12 @@ def test_inspector_can_delete_draft_inspection(client: TestClient) -> None:
     assert missing.status_code == 404
 
 
-def test_submitted_inspection_cannot_be_deleted(client: TestClient) -> None:
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
+def test_submitted_inspection_cannot_be_deleted(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    create_submitted_inspection: Callable[..., date],
+) -> None:
+    headers = auth_headers["inspector"]
     create_submitted_inspection()
     with SessionLocal() as db:
         inspection = db.query(Inspection).filter(Inspection.status == InspectionStatus.submitted.value).first()
@@ -264,10 +472,13 @@ def test_submitted_inspection_cannot_be_deleted(client: TestClient) -> None:
     assert still_there.status_code == 200
 
 
-def test_inspection_note_history_tracks_authors(client: TestClient) -> None:
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
-    templates = client.get("/templates/", headers=headers).json()
-    template_id = templates[0]["id"]
+def test_inspection_note_history_tracks_authors(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    template_meta: TemplateMeta,
+) -> None:
+    headers = auth_headers["inspector"]
+    template_id = template_meta.id
     initial = client.post(
         "/inspections/",
         json={"template_id": template_id, "notes": "Initial walk-through"},
@@ -288,24 +499,26 @@ def test_inspection_note_history_tracks_authors(client: TestClient) -> None:
     assert all(entry["author"]["email"] == "inspector@example.com" for entry in notes)
 
 
-def test_assigned_supervisor_sees_only_assigned_actions(client: TestClient) -> None:
-    ensure_assigned_supervisor()
+def test_assigned_supervisor_sees_only_assigned_actions(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    user_ids: Dict[str, str],
+    create_action_for_owner: Callable[[], int],
+) -> None:
     owner_action_id = create_action_for_owner()
-    with SessionLocal() as db:
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
+    with SessionLocal.begin() as db:
         inspection = db.query(Inspection).first()
-        assert inspector is not None and inspection is not None
+        assert inspection is not None
         extra = CorrectiveAction(
             inspection_id=inspection.id,
             title="Extra action",
             severity=ActionSeverity.low.value,
             status=ActionStatus.open.value,
-            started_by_id=inspector.id,
-            assigned_to_id=inspector.id,
+            started_by_id=user_ids["inspector"],
+            assigned_to_id=user_ids["inspector"],
         )
         db.add(extra)
-        db.commit()
-    headers = authenticate(client, ASSIGNEE_EMAIL, ASSIGNEE_PASSWORD)
+    headers = auth_headers["supervisor"]
     response = client.get("/actions/", headers=headers)
     assert response.status_code == 200
     payload = response.json()
@@ -316,25 +529,28 @@ def test_assigned_supervisor_sees_only_assigned_actions(client: TestClient) -> N
     assert owner_action_id in action_ids
 
 
-def test_assigned_supervisor_cannot_update_unassigned_action(client: TestClient) -> None:
-    ensure_assigned_supervisor()
-    headers = authenticate(client, ASSIGNEE_EMAIL, ASSIGNEE_PASSWORD)
+def test_assigned_supervisor_cannot_update_unassigned_action(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    user_ids: Dict[str, str],
+    action_owner: str,
+    create_submitted_inspection: Callable[..., date],
+) -> None:
+    headers = auth_headers["supervisor"]
     create_submitted_inspection()
-    with SessionLocal() as db:
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
+    with SessionLocal.begin() as db:
         inspection = db.query(Inspection).first()
-        assert inspector is not None and inspection is not None
+        assert inspection is not None
         action = CorrectiveAction(
             inspection_id=inspection.id,
             title="Inspector owned",
             severity=ActionSeverity.low.value,
             status=ActionStatus.open.value,
-            started_by_id=inspector.id,
-            assigned_to_id=inspector.id,
+            started_by_id=user_ids["inspector"],
+            assigned_to_id=user_ids["inspector"],
         )
         db.add(action)
-        db.commit()
-        action_id = action.id
+    action_id = action.id
     response = client.put(
         f"/actions/{action_id}",
         json={"resolution_notes": "Attempted"},
@@ -343,10 +559,13 @@ def test_assigned_supervisor_cannot_update_unassigned_action(client: TestClient)
     assert response.status_code == 404
 
 
-def test_assigned_supervisor_updates_notes_on_owned_action(client: TestClient) -> None:
-    ensure_assigned_supervisor()
+def test_assigned_supervisor_updates_notes_on_owned_action(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    create_action_for_owner: Callable[[], int],
+) -> None:
     owner_action_id = create_action_for_owner()
-    headers = authenticate(client, ASSIGNEE_EMAIL, ASSIGNEE_PASSWORD)
+    headers = auth_headers["supervisor"]
     response = client.put(
         f"/actions/{owner_action_id}",
         json={"resolution_notes": "Investigating root cause"},
@@ -362,11 +581,14 @@ def test_assigned_supervisor_updates_notes_on_owned_action(client: TestClient) -
     assert forbidden.status_code == 400
 
 
-def test_action_note_history_tracks_multiple_authors(client: TestClient) -> None:
-    ensure_assigned_supervisor()
+def test_action_note_history_tracks_multiple_authors(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    create_action_for_owner: Callable[[], int],
+) -> None:
     owner_action_id = create_action_for_owner()
-    owner_headers = authenticate(client, ASSIGNEE_EMAIL, ASSIGNEE_PASSWORD)
-    admin_headers = authenticate(client, "admin@example.com", "adminpass")
+    owner_headers = auth_headers["supervisor"]
+    admin_headers = auth_headers["admin"]
 
     first = client.put(
         f"/actions/{owner_action_id}",
@@ -388,10 +610,41 @@ def test_action_note_history_tracks_multiple_authors(client: TestClient) -> None
     assert authors == [ASSIGNEE_EMAIL, "admin@example.com"]
 
 
-def test_assigned_supervisor_can_upload_attachment(client: TestClient) -> None:
-    ensure_assigned_supervisor()
+@pytest.mark.parametrize(
+    ("role", "body", "expected_status"),
+    [
+        ("supervisor", CLOSE_WITH_NOTES, 400),
+        ("admin", {"status": "closed"}, 400),
+        ("admin", {**CLOSE_WITH_NOTES, "work_order_required": True}, 400),
+        ("admin", CLOSE_WITH_NOTES, 200),
+    ],
+    ids=["assignee-cannot-close", "notes-required", "work-order-required", "manager-closes"],
+)
+def test_action_close_rules(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    create_action_for_owner: Callable[[], int],
+    role: str,
+    body: Dict[str, object],
+    expected_status: int,
+) -> None:
+    action_id = create_action_for_owner()
+    response = client.put(f"/actions/{action_id}", json=body, headers=auth_headers[role])
+    assert response.status_code == expected_status, response.text
+    if expected_status == 200:
+        closed = response.json()
+        assert closed["status"] == "closed"
+        assert closed["closed_by"]["email"] == "admin@example.com"
+
+
+def test_assigned_supervisor_can_upload_attachment(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    create_action_for_owner: Callable[[], int],
+    media_store: Dict[str, bytes],
+) -> None:
     owner_action_id = create_action_for_owner()
-    headers = authenticate(client, ASSIGNEE_EMAIL, ASSIGNEE_PASSWORD)
+    headers = auth_headers["supervisor"]
     files = {"file": ("evidence.jpg", b"123456", "image/jpeg")}
     response = client.post(
         "/files/",
@@ -400,17 +653,18 @@ def test_assigned_supervisor_can_upload_attachment(client: TestClient) -> None:
         headers=headers,
     )
     assert response.status_code == 201
+    assert list(media_store.values()) == [b"123456"]
 
 
-def test_inspector_cannot_upload_media_for_foreign_inspection(client: TestClient) -> None:
-    temp_email = "temp_inspector@example.com"
-    temp_password = "temppass"
-    create_temp_inspector(temp_email, temp_password)
-
-    temp_headers = authenticate(client, temp_email, temp_password)
-    templates = client.get("/templates/", headers=temp_headers).json()
-    template_id = templates[0]["id"]
-    template_item_id = templates[0]["sections"][0]["items"][0]["id"]
+def test_inspector_cannot_upload_media_for_foreign_inspection(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    temp_inspector: Tuple[str, str, Dict[str, str]],
+    template_meta: TemplateMeta,
+) -> None:
+    _, _, temp_headers = temp_inspector
+    template_id = template_meta.id
+    template_item_id = template_meta.item_ids[0]
 
     inspection = client.post("/inspections/", json={"template_id": template_id}, headers=temp_headers).json()
     response = client.post(
@@ -428,7 +682,7 @@ def test_inspector_cannot_upload_media_for_foreign_inspection(client: TestClient
     )
     assert upload_ok.status_code == 201
 
-    inspector_headers = authenticate(client, "inspector@example.com", "inspectorpass")
+    inspector_headers = auth_headers["inspector"]
     forbidden = client.post(
         "/files/",
         params={"response_id": response["id"]},
@@ -446,9 +700,12 @@ def test_inspector_cannot_upload_media_for_foreign_inspection(client: TestClient
     assert other_listing.json() == []
 
 
-def test_reports_endpoint_returns_pdf_for_admin(client: TestClient) -> None:
-    report_date = create_submitted_inspection(location="Main Plant")
-    headers = authenticate(client, "admin@example.com", "adminpass")
+def test_reports_endpoint_returns_pdf_for_admin(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    report_date: date,
+) -> None:
+    headers = auth_headers["admin"]
     response = client.get(
         f"/reports/inspections.pdf?start={report_date.isoformat()}&end={report_date.isoformat()}",
         headers=headers,
@@ -459,9 +716,12 @@ def test_reports_endpoint_returns_pdf_for_admin(client: TestClient) -> None:
     assert "inspections-" in response.headers["content-disposition"]
 
 
-def test_reports_endpoint_forbidden_for_non_reviewer(client: TestClient) -> None:
-    report_date = create_submitted_inspection()
-    headers = authenticate(client, "inspector@example.com", "inspectorpass")
+def test_reports_endpoint_forbidden_for_non_reviewer(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    report_date: date,
+) -> None:
+    headers = auth_headers["inspector"]
     response = client.get(
         f"/reports/inspections.pdf?start={report_date.isoformat()}&end={report_date.isoformat()}",
         headers=headers,
@@ -469,8 +729,7 @@ def test_reports_endpoint_forbidden_for_non_reviewer(client: TestClient) -> None
     assert response.status_code == 403
 
 
-def test_generate_inspections_range_pdf_contains_action_data(client: TestClient) -> None:
-    report_date = create_submitted_inspection(location="Hangar B")
+def test_generate_inspections_range_pdf_contains_action_data(client: TestClient, report_date: date) -> None:
     with SessionLocal() as db:
         summary = report_service.build_inspections_range_summary(db, report_date, report_date, {})
     assert summary["location_counts"]["Hangar B"] == 1
@@ -479,7 +738,10 @@ def test_generate_inspections_range_pdf_contains_action_data(client: TestClient)
     assert summary["top_failures"][0]["failures"] == 1
 
 
-def test_range_summary_honors_location_id_filter(client: TestClient) -> None:
+def test_range_summary_honors_location_id_filter(
+    client: TestClient,
+    create_submitted_inspection: Callable[..., date],
+) -> None:
     report_date = create_submitted_inspection(location="Warehouse Alpha", persist_location=True)
     with SessionLocal() as db:
         location = db.query(Location).filter(Location.name == "Warehouse Alpha").first()
@@ -502,22 +764,64 @@ def test_range_summary_honors_location_id_filter(client: TestClient) -> None:
         assert len(missing["inspections"]) == 0
 
 
-def test_assignment_generation_respects_end_date(client: TestClient) -> None:
-    headers = authenticate(client, "admin@example.com", "adminpass")
+def test_range_summary_orders_breakdowns_by_count_then_label(
+    client: TestClient,
+    create_submitted_inspection: Callable[..., date],
+) -> None:
+    for location in ("Dock B", "Dock A", "Dock C", "Dock B", "Dock A", "Dock C", "Dock C"):
+        report_date = create_submitted_inspection(location=location)
     with SessionLocal() as db:
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
-        assert inspector is not None
-        template = db.query(ChecklistTemplate).first()
-        assert template is not None
-
-    start_due_at = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+        summary = report_service.build_inspections_range_summary(db, report_date, report_date, {})
+    for breakdown in ("status_counts", "template_counts", "location_counts"):
+        entries = list(summary[breakdown].items())
+        assert entries == sorted(entries, key=lambda entry: (-entry[1], entry[0]))
+    docks = [label for label in summary["location_counts"] if label.startswith("Dock ")]
+    assert docks == ["Dock C", "Dock A", "Dock B"]
+
+
+def test_range_summary_counts_completions_of_slots_due_outside_range(
+    client: TestClient,
+    base_inspection_ids: SeedIds,
+) -> None:
+    with SessionLocal.begin() as db:
+        inspection = add_submitted_inspection(db, base_inspection_ids, "Dock Scheduled")
+        # The slot was due a month before the inspection that fulfilled it.
+        inspection.scheduled_inspection = ScheduledInspection(
+            assignment=Assignment(
+                assigned_to_id=base_inspection_ids.inspector_id,
+                template_id=base_inspection_ids.template_id,
+                location="Dock Scheduled",
+            ),
+            period_start=(inspection.submitted_at - timedelta(days=35)).date(),
+            due_at=inspection.submitted_at - timedelta(days=30),
+        )
+    report_date = inspection.submitted_at.date()
+    with SessionLocal() as db:
+        summary = report_service.build_inspections_range_summary(
+            db,
+            report_date,
+            report_date,
+            {"location": "Dock Scheduled"},
+        )
+    assert summary["scheduled_totals"]["completed"] == 1
+
+
+def test_assignment_generation_respects_end_date(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    user_ids: Dict[str, str],
+    now: datetime,
+    template_meta: TemplateMeta,
+) -> None:
+    headers = auth_headers["admin"]
+    start_due_at = now + timedelta(days=1)
     first_week_start = start_due_at.date() - timedelta(days=start_due_at.weekday())
     second_week_start = first_week_start + timedelta(days=7)
     third_week_start = second_week_start + timedelta(days=7)
 
     payload = {
-        "assigned_to_id": inspector.id,  # type: ignore[attr-defined]
-        "template_id": template.id,
+        "assigned_to_id": user_ids["inspector"],
+        "template_id": template_meta.id,
         "location": "Hangar B",
         "frequency": "weekly",
         "start_due_at": start_due_at.isoformat(),
@@ -530,17 +834,12 @@ def test_assignment_generation_respects_end_date(client: TestClient) -> None:
     assert assignment["start_due_at"].startswith(start_due_at.date().isoformat())
     assert assignment["end_date"] == (start_due_at.date() + timedelta(days=10)).isoformat()
 
-    resp1 = client.post("/scheduler/generate", params={"weekStart": first_week_start.isoformat()}, headers=headers)
-    assert resp1.status_code == 201
-    assert len(resp1.json()) == 1
-
-    resp2 = client.post("/scheduler/generate", params={"weekStart": second_week_start.isoformat()}, headers=headers)
-    assert resp2.status_code == 201
-    assert len(resp2.json()) == 1
-
-    resp3 = client.post("/scheduler/generate", params={"weekStart": third_week_start.isoformat()}, headers=headers)
-    assert resp3.status_code == 201
-    assert resp3.json() == []
+    # The end date stops the series after two weekly occurrences, so the third week stays empty.
+    expected_per_week = [(first_week_start, 1), (second_week_start, 1), (third_week_start, 0)]
+    for week_start, expected in expected_per_week:
+        generated = client.post("/scheduler/generate", params={"weekStart": week_start.isoformat()}, headers=headers)
+        assert generated.status_code == 201
+        assert len(generated.json()) == expected, week_start
 
     assignments = client.get("/assignments/", headers=headers).json()
     created = next(item for item in assignments if item["id"] == assignment["id"])
@@ -548,19 +847,19 @@ def test_assignment_generation_respects_end_date(client: TestClient) -> None:
     assert created["frequency"] == "weekly"
 
 
-def test_inspector_can_start_assignment(client: TestClient) -> None:
-    admin_headers = authenticate(client, "admin@example.com", "adminpass")
-    inspector_headers = authenticate(client, "inspector@example.com", "inspectorpass")
-    with SessionLocal() as db:
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
-        template = db.query(ChecklistTemplate).first()
-        assert inspector is not None
-        assert template is not None
-
-    start_due_at = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+def test_inspector_can_start_assignment(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    user_ids: Dict[str, str],
+    now: datetime,
+    template_meta: TemplateMeta,
+) -> None:
+    admin_headers = auth_headers["admin"]
+    inspector_headers = auth_headers["inspector"]
+    start_due_at = now + timedelta(days=1)
     payload = {
-        "assigned_to_id": inspector.id,  # type: ignore[attr-defined]
-        "template_id": template.id,
+        "assigned_to_id": user_ids["inspector"],
+        "template_id": template_meta.id,
         "location": "Hangar C",
         "frequency": "weekly",
         "start_due_at": start_due_at.isoformat(),
@@ -572,26 +871,26 @@ def test_inspector_can_start_assignment(client: TestClient) -> None:
     start_resp = client.post(f"/assignments/{assignment_id}/start", headers=inspector_headers)
     assert start_resp.status_code == 201, start_resp.text
     inspection = start_resp.json()
-    assert inspection["template_id"] == template.id
-    assert inspection["inspector_id"] == inspector.id
+    assert inspection["template_id"] == template_meta.id
+    assert inspection["inspector_id"] == user_ids["inspector"]
     assert inspection["location"] == "Hangar C"
     assert inspection["inspection_origin"] == "assignment"
     assert inspection["scheduled_inspection_id"] is not None
 
 
-def test_weekly_overview_reflects_active_assignments(client: TestClient) -> None:
-    headers = authenticate(client, "admin@example.com", "adminpass")
-    with SessionLocal() as db:
-        inspector = db.query(User).filter(User.email == "inspector@example.com").first()
-        template = db.query(ChecklistTemplate).first()
-        assert inspector is not None
-        assert template is not None
-
+def test_weekly_overview_reflects_active_assignments(
+    client: TestClient,
+    auth_headers: AuthHeaders,
+    user_ids: Dict[str, str],
+    now: datetime,
+    template_meta: TemplateMeta,
+) -> None:
+    headers = auth_headers["admin"]
     for idx in range(2):
-        start_due_at = (datetime.utcnow() + timedelta(days=idx + 1)).replace(microsecond=0)
+        start_due_at = now + timedelta(days=idx + 1)
         payload = {
-            "assigned_to_id": inspector.id,  # type: ignore[attr-defined]
-            "template_id": template.id,
+            "assigned_to_id": user_ids["inspector"],
+            "template_id": template_meta.id,
             "location": f"Hangar Z{idx}",
             "frequency": "weekly",
             "start_due_at": start_due_at.isoformat(),
@@ -604,12 +903,53 @@ def test_weekly_overview_reflects_active_assignments(client: TestClient) -> None
     data = overview.json()
 
     with SessionLocal() as db:
-        active_weekly = (
-            db.query(Assignment)
-            .filter(Assignment.active.is_(True))
-            .filter(Assignment.frequency.ilike("weekly"))
-            .count()
+        active_weekly = db.scalar(
+            select(func.count(Assignment.id)).where(
+                Assignment.active.is_(True),
+                Assignment.frequency.ilike("weekly"),
+            )
         )
 
     assert data["total_expected"] >= active_weekly
     assert "submitted" in data and "approved" in data
+
+
+@pytest.mark.parametrize("csv_engine", ["c", "pyarrow"])
+def test_shipping_wide_import_reads_dates_under_each_csv_engine(
+    client: TestClient,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    csv_engine: str,
+) -> None:
+    pytest.importorskip("pandas")
+    if csv_engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    importer = importlib.import_module("scripts.import_shipping_2025_from_wide")
+
+    item_values = {columns["result"]: "pass" for columns in importer.ITEM_COLUMNS.values()}
+    item_values[importer.ITEM_COLUMNS["Trailers"]["result"]] = "fail"
+    item_values[importer.ITEM_COLUMNS["Trailers"]["issue"]] = "Chock missing"
+    header = ["inspection_date", "inspector", "started_at", "submitted_at", "completion_flag"]
+    header += list(chain.from_iterable(columns.values() for columns in importer.ITEM_COLUMNS.values()))
+    row = {
+        "inspection_date": "2025-03-04",
+        "inspector": "shipper@example.com",
+        "started_at": "2025-03-04 08:00:00",
+        "completion_flag": "1",
+        **item_values,
+    }
+    csv_path = tmp_path / "shipping.csv"
+    csv_path.write_text(f"{','.join(header)}\n{','.join(row.get(column, '') for column in header)}\n")
+    monkeypatch.setattr(importer, "CSV_PATH", csv_path)
+    monkeypatch.setattr(importer, "CSV_ENGINE", csv_engine)
+
+    with SessionLocal() as db:
+        assert importer.import_inspections(db) == {"created": 1, "skipped": 0}
+        inspection = db.scalars(
+            select(Inspection).join(User, Inspection.inspector_id == User.id).where(
+                User.email == "shipper@example.com"
+            )
+        ).one()
+        assert inspection.started_at == datetime(2025, 3, 4, 8, 0)
+        assert inspection.submitted_at.date() == date(2025, 3, 4)
+        assert {response.note for response in inspection.responses} - {None} == {"Chock missing"}